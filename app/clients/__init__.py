@@ -1,3 +1,3 @@
-from app.clients_pkg import KBClient, OpenAIClient, PersonaPlexClient, normalize_kb_items
+from app.clients.core import KBClient, OpenAIClient, PersonaPlexClient, normalize_kb_items
 
 __all__ = ["KBClient", "OpenAIClient", "PersonaPlexClient", "normalize_kb_items"]
@@ -0,0 +1,192 @@
+import asyncio
+import random
+from typing import Any, AsyncIterator
+
+import httpx
+import orjson
+
+from app.config import Settings
+
+_BACKOFF_BASE = 0.2
+_BACKOFF_CAP = 5.0
+_ANSWER_KEYS = ("answer", "text")
+
+
+class HTTPClientBase:
+    def __init__(self, settings: Settings):
+        self.timeout = settings.request_timeout_seconds
+        self._client: httpx.AsyncClient | None = None
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                http2=True,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _request_with_retry(
+        self,
+        method: str,
+        url: str,
+        *,
+        retries: int = 2,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        client = await self._get_client()
+        last_error: Exception | None = None
+        for attempt in range(retries + 1):
+            try:
+                response = await client.request(method, url, **kwargs)
+                response.raise_for_status()
+                return response
+            except (httpx.HTTPError, httpx.TimeoutException) as exc:
+                last_error = exc
+                if attempt >= retries:
+                    break
+                await asyncio.sleep(random.uniform(0, min(_BACKOFF_CAP, _BACKOFF_BASE * (2**attempt))))
+        raise RuntimeError(f"Request failed for {url}: {last_error}")
+
+
+class KBClient(HTTPClientBase):
+    def __init__(self, settings: Settings):
+        super().__init__(settings)
+        self.base_url = (settings.kb_base_url or "").rstrip("/")
+        self.api_key = settings.kb_api_key
+
+    async def search(self, query: str, top_k: int = 5) -> list[dict[str, Any]]:
+        if not self.base_url:
+            return []
+
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        payload = {"query": query, "top_k": top_k}
+        response = await self._request_with_retry(
+            "POST",
+            f"{self.base_url}/kb/search",
+            json=payload,
+            headers=headers,
+        )
+        return normalize_kb_items(orjson.loads(response.content))
+
+
+class PersonaPlexClient(HTTPClientBase):
+    def __init__(self, settings: Settings):
+        super().__init__(settings)
+        self.base_url = (settings.personaplex_base_url or "").rstrip("/")
+
+    async def generate(self, transcript: str, context: str = "") -> str:
+        if not self.base_url:
+            return ""
+
+        payload = {"transcript": transcript, "context": context}
+        response = await self._request_with_retry(
+            "POST",
+            f"{self.base_url}/v1/generate",
+            json=payload,
+        )
+        data = orjson.loads(response.content)
+        return next((data[key] for key in _ANSWER_KEYS if data.get(key)), "").strip()
+
+
+class OpenAIClient:
+    SYSTEM_PROMPT = "You are a concise and helpful assistant."
+
+    def __init__(self, settings: Settings):
+        api_key = (settings.openai_api_key or "").strip()
+        if not api_key or api_key in {"your_key_here", "your_key*here"}:
+            self.client = None
+        else:
+            self.client = _get_openai_cls()(api_key=api_key, timeout=settings.request_timeout_seconds)
+        self.model = settings.openai_model
+
+    async def generate_answer(self, transcript: str, context: str = "") -> str:
+        if not self.client:
+            return ""
+
+        from openai import OpenAIError
+
+        try:
+            completion = await self.client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(transcript, context),
+                temperature=0.3,
+            )
+            return (completion.choices[0].message.content or "").strip()
+        except OpenAIError:
+            return ""
+
+    async def stream_answer(self, transcript: str, context: str = "") -> AsyncIterator[str]:
+        if not self.client:
+            return
+
+        from openai import OpenAIError
+
+        # A failure before the first delta yields nothing, so LLMService falls back to
+        # PersonaPlex; once text has been yielded, errors propagate rather than
+        # leaving the caller with a silently truncated answer.
+        started = False
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(transcript, context),
+                temperature=0.3,
+                stream=True,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    started = True
+                    yield chunk.choices[0].delta.content
+        except OpenAIError:
+            if started:
+                raise
+
+    async def aclose(self) -> None:
+        if self.client is not None:
+            await self.client.close()
+
+    def _messages(self, transcript: str, context: str) -> list[dict[str, str]]:
+        messages: list[dict[str, str]] = [{"role": "system", "content": self.SYSTEM_PROMPT}]
+        if context:
+            messages.append({"role": "assistant", "content": f"Context:\n{context}"})
+        messages.append({"role": "user", "content": transcript})
+        return messages
+
+
+def _get_openai_cls():
+    # Imported on first use so gateways without an OpenAI key skip the SDK import.
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI
+
+
+def normalize_kb_items(raw_kb: Any) -> list[dict[str, Any]]:
+    if isinstance(raw_kb, list):
+        return _only_dicts(raw_kb)
+    if isinstance(raw_kb, dict):
+        for key in ("results", "data", "items"):
+            value = raw_kb.get(key)
+            if isinstance(value, list):
+                return _only_dicts(value)
+    if isinstance(raw_kb, (str, bytes)):
+        try:
+            return normalize_kb_items(orjson.loads(raw_kb))
+        except Exception:
+            return []
+    return []
+
+
+def _only_dicts(items: list[Any]) -> list[dict[str, Any]]:
+    # Exact type check: decoded JSON objects are always plain dicts.
+    return [item for item in items if type(item) is dict]
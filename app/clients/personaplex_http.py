@@ -1,15 +1,28 @@
 import os
 import httpx
+import orjson
+
+_BASE_URL = os.getenv("PERSONAPLEX_URL", "https://deds0k3ekp5j3d-8000.proxy.runpod.net").rstrip("/")
 
 class PersonaPlexHTTPClient:
     def __init__(self):
-        self.base_url = os.getenv("https://deds0k3ekp5j3d-8000.proxy.runpod.net/")
+        self.base_url = _BASE_URL
         if not self.base_url:
             raise RuntimeError("Missing PERSONAPLEX_URL env var")
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=300)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def tts(self, text: str, voice_prompt: str = "NATF2.pt"):
         url = f"{self.base_url}/tts"
-        async with httpx.AsyncClient(timeout=300) as client:
-            r = await client.post(url, json={"text": text, "voice_prompt": voice_prompt})
-            r.raise_for_status()
-            return r.json()
+        r = await self._get_client().post(url, json={"text": text, "voice_prompt": voice_prompt})
+        r.raise_for_status()
+        return orjson.loads(r.content)
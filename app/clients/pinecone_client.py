@@ -1,35 +1,50 @@
+import asyncio
 import os
+import threading
 from typing import Any
 
+_index: Any = None
+_index_lock = threading.Lock()
 
-class PineconeClient:
-    def __init__(self) -> None:
-        self.namespace = os.getenv("PINECONE_NAMESPACE", "xccelera-hr")
-        self._index = None
 
-    def _get_index(self):
-        if self._index is not None:
-            return self._index
+def _pinecone_index():
+    # One Index handle per process so its connection pool is shared by every client.
+    # aquery calls this from executor threads, so build it under a lock exactly once.
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = _build_pinecone_index()
+    return _index
 
-        api_key = os.getenv("PINECONE_API_KEY")
-        index_name = os.getenv("PINECONE_INDEX")
-        host = os.getenv("PINECONE_HOST")
 
-        if not api_key:
-            raise RuntimeError("Missing PINECONE_API_KEY")
-        if not index_name:
-            raise RuntimeError("Missing PINECONE_INDEX")
-        if not host:
-            raise RuntimeError("Missing PINECONE_HOST")
+def _build_pinecone_index():
+    api_key = os.getenv("PINECONE_API_KEY")
+    index_name = os.getenv("PINECONE_INDEX")
+    host = os.getenv("PINECONE_HOST")
 
-        try:
-            from pinecone import Pinecone
-        except ModuleNotFoundError as exc:
-            raise RuntimeError("pinecone package is not installed") from exc
+    if not api_key:
+        raise RuntimeError("Missing PINECONE_API_KEY")
+    if not index_name:
+        raise RuntimeError("Missing PINECONE_INDEX")
+    if not host:
+        raise RuntimeError("Missing PINECONE_HOST")
 
-        pc = Pinecone(api_key=api_key)
-        self._index = pc.Index(name=index_name, host=host)
-        return self._index
+    try:
+        from pinecone import Pinecone
+    except ModuleNotFoundError as exc:
+        raise RuntimeError("pinecone package is not installed") from exc
+
+    pc = Pinecone(api_key=api_key)
+    return pc.Index(name=index_name, host=host)
+
+
+class PineconeClient:
+    def __init__(self) -> None:
+        self.namespace = os.getenv("PINECONE_NAMESPACE", "xccelera-hr")
+
+    def _get_index(self):
+        return _pinecone_index()
 
     def query(self, vector: list[float], top_k: int = 5) -> Any:
         index = self._get_index()
@@ -39,3 +54,7 @@ class PineconeClient:
             namespace=self.namespace,
             include_metadata=True,
         )
+
+    async def aquery(self, vector: list[float], top_k: int = 5) -> Any:
+        # The Pinecone SDK is blocking; keep it off the event loop.
+        return await asyncio.get_running_loop().run_in_executor(None, self.query, vector, top_k)
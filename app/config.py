@@ -1,46 +1,121 @@
+import json
+import os
+import re
+from dataclasses import dataclass, field
 from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
 
-from pydantic import Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
 
+def _parse_list(value: str) -> list[str]:
+    value = value.strip()
+    if value.startswith("["):
+        return [str(item) for item in json.loads(value)]
+    return [item.strip() for item in value.split(",") if item.strip()]
 
-class Settings(BaseSettings):
-    app_name: str = Field(default="PersonaPlex Voice Assistant", alias="APP_NAME")
-    environment: str = Field(default="development", alias="ENVIRONMENT")
 
-    openai_api_key: str | None = Field(default=None, alias="OPENAI_API_KEY")
-    openai_model: str = Field(default="gpt-4o-mini", alias="OPENAI_MODEL")
+@dataclass(slots=True, frozen=True)
+class Settings:
+    app_name: str = "PersonaPlex Voice Assistant"
+    environment: str = "development"
 
-    elevenlabs_api_key: str | None = Field(default=None, alias="ELEVENLABS_API_KEY")
-    elevenlabs_voice_id: str = Field(default="21m00Tcm4TlvDq8ikWAM", alias="ELEVENLABS_VOICE_ID")
+    openai_api_key: str | None = None
+    openai_model: str = "gpt-4o-mini"
 
-    kb_base_url: str | None = Field(default=None, alias="KB_BASE_URL")
-    kb_api_key: str | None = Field(default=None, alias="KB_API_KEY")
+    elevenlabs_api_key: str | None = None
+    elevenlabs_voice_id: str = "21m00Tcm4TlvDq8ikWAM"
 
-    personaplex_base_url: str | None = Field(default=None, alias="PERSONAPLEX_BASE_URL")
+    kb_base_url: str | None = None
+    kb_api_key: str | None = None
 
-    request_timeout_seconds: float = Field(default=60.0, alias="REQUEST_TIMEOUT_SECONDS")
-    output_dir: str = Field(default="/tmp/personaplex_outputs", alias="OUTPUT_DIR")
-    max_upload_bytes: int = Field(default=20 * 1024 * 1024, alias="MAX_UPLOAD_BYTES")
+    personaplex_base_url: str | None = None
 
-    allowed_origins: list[str] = Field(
-        default=[
+    request_timeout_seconds: float = 60.0
+    output_dir: str = "/tmp/personaplex_outputs"
+    max_upload_bytes: int = 20 * 1024 * 1024
+
+    embed_cache_size: int = 4096
+    embed_cache_ttl_seconds: float = 0.0
+    embed_cache_db: str | None = None
+
+    qv_cache_size: int = 1024
+    qv_cache_similarity: float = 0.92
+    qv_cache_ttl_seconds: float = 300.0
+
+    tts_concurrency: int = 2
+
+    response_cache_similarity: float = 0.0
+    response_cache_size: int = 1000
+
+    allowed_origins: list[str] = field(
+        default_factory=lambda: [
             "http://localhost:3000",
             "http://localhost:5173",
             "http://localhost:8000",
             "http://127.0.0.1:8000",
-        ],
-        alias="ALLOWED_ORIGINS",
+        ]
     )
 
-    model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
-        case_sensitive=False,
-        extra="ignore",
-    )
+
+# env var -> (Settings field, cast)
+_ENV_VARS: dict[str, tuple[str, Callable[[str], Any]]] = {
+    "APP_NAME": ("app_name", str),
+    "ENVIRONMENT": ("environment", str),
+    "OPENAI_API_KEY": ("openai_api_key", str),
+    "OPENAI_MODEL": ("openai_model", str),
+    "ELEVENLABS_API_KEY": ("elevenlabs_api_key", str),
+    "ELEVENLABS_VOICE_ID": ("elevenlabs_voice_id", str),
+    "KB_BASE_URL": ("kb_base_url", str),
+    "KB_API_KEY": ("kb_api_key", str),
+    "PERSONAPLEX_BASE_URL": ("personaplex_base_url", str),
+    "REQUEST_TIMEOUT_SECONDS": ("request_timeout_seconds", float),
+    "OUTPUT_DIR": ("output_dir", str),
+    "MAX_UPLOAD_BYTES": ("max_upload_bytes", int),
+    "EMBED_CACHE_SIZE": ("embed_cache_size", int),
+    "EMBED_CACHE_TTL": ("embed_cache_ttl_seconds", float),
+    "EMBED_CACHE_DB": ("embed_cache_db", str),
+    "QV_CACHE_SIZE": ("qv_cache_size", int),
+    "QV_CACHE_SIMILARITY": ("qv_cache_similarity", float),
+    "QV_CACHE_TTL": ("qv_cache_ttl_seconds", float),
+    "TTS_CONCURRENCY": ("tts_concurrency", int),
+    "RESPONSE_CACHE_SIMILARITY": ("response_cache_similarity", float),
+    "RESPONSE_CACHE_SIZE": ("response_cache_size", int),
+    "ALLOWED_ORIGINS": ("allowed_origins", _parse_list),
+}
+
+
+def _read_env_file(path: Path) -> dict[str, str]:
+    if not path.is_file():
+        return {}
+
+    values: dict[str, str] = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.removeprefix("export ").split("=", 1)
+        values[key.strip().upper()] = _parse_env_value(value)
+    return values
+
+
+_INLINE_COMMENT = re.compile(r"\s+#.*$")
+
+
+def _parse_env_value(raw: str) -> str:
+    # Same rules as python-dotenv: quoted values are taken verbatim up to the closing
+    # quote; unquoted values lose a trailing " # comment".
+    value = raw.strip()
+    if value[:1] in ("'", '"'):
+        end = value.find(value[0], 1)
+        if end != -1:
+            return value[1:end]
+    return _INLINE_COMMENT.sub("", raw).strip()
 
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    return Settings()
+    # Process env wins over .env; names are matched case-insensitively.
+    env = _read_env_file(Path(".env"))
+    env.update((key.upper(), value) for key, value in os.environ.items())
+    values = {name: cast(env[var]) for var, (name, cast) in _ENV_VARS.items() if var in env}
+    return Settings(**values)
@@ -1,43 +1,93 @@
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 # Your KB folders are at repo root: /faq /hiring /policies ...
 REPO_ROOT = Path(__file__).resolve().parent.parent
 
 KB_FOLDERS = ["faq", "hiring", "policies"]
 
+_STOPWORDS = frozenset({"the", "a", "an", "is", "of", "to", "and", "or", "in"})
+
+# (fingerprint of the KB tree, docs loaded for it)
+_DOCS_CACHE: Tuple[int, List[Dict]] | None = None
+
 def iter_md_files():
     for folder in KB_FOLDERS:
         p = REPO_ROOT / folder
         if p.exists() and p.is_dir():
             yield from p.rglob("*.md")
 
+def _read_md(path: Path) -> str:
+    return path.read_text(encoding="utf-8", errors="ignore")
+
+def _fingerprint(files: List[Path]) -> int:
+    return sum(f.stat().st_mtime_ns for f in files) ^ (len(files) << 1)
+
+def kb_fingerprint() -> int:
+    return _fingerprint(list(iter_md_files()))
+
 def load_docs() -> List[Dict]:
+    global _DOCS_CACHE
+    files = list(iter_md_files())
+    fp = _fingerprint(files)
+    if _DOCS_CACHE is not None and _DOCS_CACHE[0] == fp:
+        return _DOCS_CACHE[1]
+
+    with ThreadPoolExecutor(max_workers=16) as ex:
+        texts = list(ex.map(_read_md, files))
+
     docs = []
-    for f in iter_md_files():
-        text = f.read_text(encoding="utf-8", errors="ignore")
+    for f, text in zip(files, texts):
         docs.append(
             {
                 "id": str(f.relative_to(REPO_ROOT)).replace("\\", "/"),
                 "text": text,
+                "lower": text.lower(),
             }
         )
+    _DOCS_CACHE = (fp, docs)
     return docs
 
+@lru_cache(maxsize=1)
+def _build_index(fingerprint: int) -> Tuple[List[Dict], Dict[str, Dict[int, int]]]:
+    # token -> {doc index: term frequency}; rebuilt whenever the KB fingerprint changes
+    docs = load_docs()
+    postings: Dict[str, Dict[int, int]] = {}
+    for i, d in enumerate(docs):
+        for tok, tf in Counter(re.findall(r"\w+", d["lower"])).items():
+            postings.setdefault(tok, {})[i] = tf
+    return docs, postings
+
+def invalidate() -> None:
+    """Drop the cached docs and index so the next search re-reads the KB folders."""
+    global _DOCS_CACHE
+    _DOCS_CACHE = None
+    _build_index.cache_clear()
+
 def keyword_search(query: str, k: int = 3) -> List[Dict]:
     q = (query or "").lower().strip()
     if not q:
         return []
 
-    tokens = [t for t in q.split() if t]
-    docs = load_docs()
+    tokens = {t for t in re.findall(r"\w+", q) if len(t) > 1 and t not in _STOPWORDS}
+    if not tokens:
+        return []
+
+    docs, postings = _build_index(kb_fingerprint())
+
+    token_postings = [postings[tok] for tok in tokens if tok in postings]
+    candidates = set()
+    for posting in token_postings:
+        candidates.update(posting)
 
     scored = []
-    for d in docs:
-        t = d["text"].lower()
-        score = sum(1 for tok in tokens if tok in t)
-        if score > 0:
-            scored.append((score, d))
+    for i in sorted(candidates):
+        score = sum(posting.get(i, 0) for posting in token_postings)
+        scored.append((score, docs[i]))
 
     scored.sort(key=lambda x: x[0], reverse=True)
     return [d for _, d in scored[:k]]
@@ -1,38 +1,56 @@
 import asyncio
+import io
+import shutil
 from pathlib import Path
-from app.kb import keyword_search
-from fastapi import Query
-import httpx
-from fastapi import Query
 
-from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+import httpx
+from fastapi import FastAPI, File, Form, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from app.routes.kb import router as kb_router
 
 from app.clients import KBClient, OpenAIClient, PersonaPlexClient
 from app.config import get_settings
+from app.kb import keyword_search
+from app.routes.kb import router as kb_router
 from app.services.llm import LLMService
+from app.services.response_cache import CachedResponse, ResponseCache
 from app.services.stt import STTService
 from app.services.tts import TTSService
 from app.storage import JobStorage
 
 ALLOWED_AUDIO_EXTENSIONS = {".wav", ".mp3", ".webm", ".m4a"}
+_UNSUPPORTED_AUDIO_DETAIL = f"Unsupported audio type. Allowed: {', '.join(sorted(ALLOWED_AUDIO_EXTENSIONS))}"
+_EMPTY_METADATA: dict = {}
+SSE_IDLE_TIMEOUT_SECONDS = 30
+SSE_RECHECK_SECONDS = 2
+KB_CONTEXT_DOC_CHARS = 1500
+KB_CONTEXT_MAX_CHARS = 6000
 
 settings = get_settings()
 storage = JobStorage(output_dir=settings.output_dir)
 #kb_client = KBClient(settings=settings)
 openai_client = OpenAIClient(settings=settings)
 personaplex_client = PersonaPlexClient(settings=settings)
-stt_service = STTService(settings=settings)
-tts_service = TTSService(settings=settings)
+http_client = httpx.AsyncClient(
+    timeout=settings.request_timeout_seconds,
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    http2=True,
+)
+stt_service = STTService(settings=settings, client=http_client)
+tts_service = TTSService(settings=settings, client=http_client)
 llm_service = LLMService(openai_client=openai_client, personaplex_client=personaplex_client)
+response_cache = ResponseCache(
+    db_path=Path(settings.output_dir) / "responses.db",
+    threshold=settings.response_cache_similarity,
+    max_entries=settings.response_cache_size,
+)
 
 templates = Jinja2Templates(directory="templates")
 
-app = FastAPI(title=settings.app_name, version="2.0.0")
+app = FastAPI(title=settings.app_name, version="2.0.0", default_response_class=ORJSONResponse)
+app.state.http = http_client
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 if settings.environment.lower() == "production":
@@ -50,6 +68,14 @@ app.add_middleware(
 
 app.include_router(kb_router)
 
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await personaplex_client.aclose()
+    await openai_client.aclose()
+    await http_client.aclose()
+
+
 @app.get("/health")
 async def health() -> dict[str, bool]:
     return {"ok": True}
@@ -115,29 +141,46 @@ async def api_voice(
     storage.update_job(job_id, status="processing")
 
     audio_input_name = f"input{extension}"
-    audio_input_path = storage.save_bytes(job_id, audio_input_name, audio_bytes)
+    audio_input_path = await asyncio.to_thread(storage.save_bytes, job_id, audio_input_name, audio_bytes)
 
     try:
         transcript = await stt_service.transcribe(audio_input_path)
 
-        # Use local markdown KB instead of external KB client
-        kb_results = keyword_search(transcript, k=5)
-        
-        citations = [r["id"] for r in kb_results]
-        
-        kb_context = "\n\n".join(
-            f"## {r['id']}\n{r['text'][:1500]}"
-            for r in kb_results
+        # Use local markdown KB instead of external KB client; persist the transcript alongside it
+        cache_scope = f"{mode}:{user_id or ''}"
+        kb_results, _, cached = await asyncio.gather(
+            asyncio.to_thread(keyword_search, transcript, k=5),
+            asyncio.to_thread(storage.save_text, job_id, "transcript.txt", transcript),
+            response_cache.lookup(transcript, scope=cache_scope),
         )
 
-        assistant_text = await llm_service.generate(transcript=transcript, context=kb_context)
-        output_extension = ".mp3" if settings.elevenlabs_api_key else ".wav"
-        output_path = storage.job_dir(job_id) / f"output{output_extension}"
-        final_audio_path = await tts_service.synthesize(text=assistant_text, output_path=output_path)
-
-        storage.save_text(job_id, "transcript.txt", transcript)
-        storage.save_text(job_id, "response.txt", assistant_text)
-        storage.save_json(
+        if cached is not None:
+            # A near-identical question was answered before: reuse its text and audio.
+            assistant_text = cached.assistant_text
+            citations = cached.citations
+            final_audio_path = storage.job_dir(job_id) / f"output{cached.audio_path.suffix}"
+            await asyncio.to_thread(shutil.copyfile, cached.audio_path, final_audio_path)
+        else:
+            citations = [r["id"] for r in kb_results]
+
+            kb_context = _build_kb_context(kb_results)
+
+            output_extension = ".mp3" if settings.elevenlabs_api_key else ".wav"
+            output_path = storage.job_dir(job_id) / f"output{output_extension}"
+            # Speak each sentence as soon as the LLM finishes it instead of after the full answer
+            assistant_text, final_audio_path = await tts_service.synthesize_stream(
+                llm_service.stream(transcript=transcript, context=kb_context),
+                output_path=output_path,
+            )
+            await response_cache.store(
+                transcript,
+                scope=cache_scope,
+                response=CachedResponse(assistant_text, citations, final_audio_path),
+            )
+
+        await asyncio.to_thread(storage.save_text, job_id, "response.txt", assistant_text)
+        await asyncio.to_thread(
+            storage.save_json,
             job_id,
             "meta.json",
             {
@@ -160,13 +203,13 @@ async def api_voice(
         "transcript": transcript,
         "assistant_text": assistant_text,
     }
-    return JSONResponse(content=payload)
+    return ORJSONResponse(content=payload)
 
 
 @app.get("/api/jobs/{job_id}")
 async def get_job(job_id: str):
     _ensure_job_exists(job_id)
-    return JSONResponse(content=storage.get_job(job_id))
+    return ORJSONResponse(content=storage.get_job(job_id))
 
 
 @app.get("/api/jobs/{job_id}/audio")
@@ -188,7 +231,7 @@ async def get_job_meta(job_id: str):
     meta_path = storage.job_dir(job_id) / "meta.json"
     if not meta_path.exists():
         raise HTTPException(status_code=404, detail="Metadata not ready")
-    return JSONResponse(content=storage.read_json(job_id, "meta.json"))
+    return ORJSONResponse(content=storage.read_json(job_id, "meta.json"))
 
 
 @app.get("/api/jobs/{job_id}/events")
@@ -196,15 +239,24 @@ async def get_job_events(job_id: str):
     _ensure_job_exists(job_id)
 
     async def event_stream():
+        loop = asyncio.get_running_loop()
         last_status = None
-        for _ in range(30):
+        idle_deadline = loop.time() + SSE_IDLE_TIMEOUT_SECONDS
+        while True:
+            job_updated = storage.job_event(job_id)
             status = storage.get_job(job_id).get("status", "unknown")
             if status != last_status:
                 yield f"data: {status}\n\n"
                 last_status = status
-            if status in {"completed", "failed"}:
+                idle_deadline = loop.time() + SSE_IDLE_TIMEOUT_SECONDS
+            if status in {"completed", "failed"} or loop.time() >= idle_deadline:
                 break
-            await asyncio.sleep(1)
+            # Local updates wake us immediately; updates made by another worker
+            # only touch job.json on disk, so re-check it periodically too.
+            try:
+                await asyncio.wait_for(job_updated.wait(), timeout=SSE_RECHECK_SECONDS)
+            except asyncio.TimeoutError:
+                pass
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
@@ -212,35 +264,46 @@ async def get_job_events(job_id: str):
 def _validate_upload(file: UploadFile) -> None:
     extension = Path(file.filename or "").suffix.lower()
     if extension not in ALLOWED_AUDIO_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported audio type. Allowed: {', '.join(sorted(ALLOWED_AUDIO_EXTENSIONS))}",
-        )
+        raise HTTPException(status_code=400, detail=_UNSUPPORTED_AUDIO_DETAIL)
 
 
 def _extract_citations(kb_results: list[dict]) -> list[str]:
     citations: list[str] = []
     for item in kb_results:
-        source = (
-            item.get("source")
-            or (item.get("metadata") or {}).get("source")
-            or (item.get("metadata") or {}).get("filename")
-        )
+        metadata = item.get("metadata") or _EMPTY_METADATA
+        source = item.get("source") or metadata.get("source") or metadata.get("filename")
         if source:
             citations.append(str(source))
     return list(dict.fromkeys(citations))
 
 
+def _build_kb_context(kb_results: list[dict]) -> str:
+    # Bounded so the LLM prompt (and its latency/cost) cannot grow with k
+    buf = io.StringIO()
+    total = 0
+    for r in kb_results:
+        chunk = r["text"][:KB_CONTEXT_DOC_CHARS]
+        if total + len(chunk) > KB_CONTEXT_MAX_CHARS:
+            break
+        if total:
+            buf.write("\n\n")
+        buf.write("## ")
+        buf.write(r["id"])
+        buf.write("\n")
+        buf.write(chunk)
+        total += len(chunk)
+    return buf.getvalue()
+
+
 def _ensure_job_exists(job_id: str) -> None:
     if not storage.job_exists(job_id):
         raise HTTPException(status_code=404, detail="Job not found")
 
 @app.get("/debug/personaplex")
 async def debug_personaplex():
-    url = settings.personaplex_url.rstrip("/") + "/health"
+    url = (settings.personaplex_base_url or "").rstrip("/") + "/health"
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            r = await client.get(url)
+        r = await http_client.get(url, timeout=10)
         return {
             "ok": True,
             "personaplex_health_url": url,
@@ -252,13 +315,3 @@ async def debug_personaplex():
             status_code=500,
             detail=f"PersonaPlex not reachable: {exc}"
         )
-
-@app.get("/debug/kb")
-def debug_kb(q: str = Query(...), k: int = 3):
-    results = keyword_search(q, k=k)
-    return {
-        "query": q,
-        "k": k,
-        "results_count": len(results),
-        "results": results,
-    }
@@ -1,3 +1,4 @@
+import asyncio
 import time
 from dataclasses import dataclass
 from typing import Any
@@ -6,6 +7,8 @@ from app.clients import KBClient, OpenAIClient, PersonaPlexClient, normalize_kb_
 from app.config import Settings
 from app.storage import JobStorage
 
+_EMPTY_METADATA: dict[str, Any] = {}
+
 
 @dataclass
 class PipelineResult:
@@ -52,16 +55,17 @@ class VoicePipeline:
         if not transcript:
             raise RuntimeError("STT returned empty transcript")
 
-        self.storage.save_json(job_id, "transcript.json", stt_payload)
-
         kb_start = time.perf_counter()
-        kb_payload = await self.kb_client.search(query=transcript, top_k=top_k)
+        kb_payload, _ = await asyncio.gather(
+            self.kb_client.search(query=transcript, top_k=top_k),
+            asyncio.to_thread(self.storage.save_json, job_id, "transcript.json", stt_payload),
+        )
         kb_ms = elapsed_ms(kb_start)
         kb_results = normalize_kb_items(kb_payload)
         self.storage.save_json(job_id, "kb.json", {"raw": kb_payload, "normalized": kb_results})
 
         llm_start = time.perf_counter()
-        response_text, citations = self._build_response_text(transcript=transcript, kb_results=kb_results)
+        response_text, citations = await self._build_response_text(transcript=transcript, kb_results=kb_results)
         llm_ms = elapsed_ms(llm_start)
 
         tts_start = time.perf_counter()
@@ -88,6 +92,7 @@ class VoicePipeline:
             job_id,
             f"job_id={job_id} stt_ms={stt_ms} kb_ms={kb_ms} llm_ms={llm_ms} tts_ms={tts_ms} total_ms={total_ms}",
         )
+        self.storage.flush_log(job_id)
 
         return PipelineResult(
             job_id=job_id,
@@ -112,16 +117,19 @@ class VoicePipeline:
         if not transcript:
             raise RuntimeError("Text input cannot be empty")
 
-        self.storage.save_json(job_id, "transcript.json", {"text": transcript, "raw": {"source": "agent/text"}})
-
         kb_start = time.perf_counter()
-        kb_payload = await self.kb_client.search(query=transcript, top_k=top_k)
+        kb_payload, _ = await asyncio.gather(
+            self.kb_client.search(query=transcript, top_k=top_k),
+            asyncio.to_thread(
+                self.storage.save_json, job_id, "transcript.json", {"text": transcript, "raw": {"source": "agent/text"}}
+            ),
+        )
         kb_ms = elapsed_ms(kb_start)
         kb_results = normalize_kb_items(kb_payload)
         self.storage.save_json(job_id, "kb.json", {"raw": kb_payload, "normalized": kb_results})
 
         llm_start = time.perf_counter()
-        response_text, citations = self._build_response_text(transcript=transcript, kb_results=kb_results)
+        response_text, citations = await self._build_response_text(transcript=transcript, kb_results=kb_results)
         llm_ms = elapsed_ms(llm_start)
 
         tts_start = time.perf_counter()
@@ -147,6 +155,7 @@ class VoicePipeline:
             job_id,
             f"job_id={job_id} stt_ms=0 kb_ms={kb_ms} llm_ms={llm_ms} tts_ms={tts_ms} total_ms={timings_ms['total_ms']}",
         )
+        self.storage.flush_log(job_id)
 
         return PipelineResult(
             job_id=job_id,
@@ -158,23 +167,19 @@ class VoicePipeline:
             timings_ms=timings_ms,
         )
 
-    def _build_response_text(self, transcript: str, kb_results: list[dict[str, Any]]) -> tuple[str, list[str]]:
+    async def _build_response_text(self, transcript: str, kb_results: list[dict[str, Any]]) -> tuple[str, list[str]]:
         snippets: list[str] = []
         citations: list[str] = []
         for item in kb_results[:5]:
+            metadata = item.get("metadata") or _EMPTY_METADATA
             snippet = (
                 item.get("text")
                 or item.get("chunk")
                 or item.get("content")
-                or (item.get("metadata") or {}).get("text")
+                or metadata.get("text")
                 or ""
             ).strip()
-            source = (
-                item.get("source")
-                or (item.get("metadata") or {}).get("source")
-                or (item.get("metadata") or {}).get("filename")
-                or "unknown"
-            )
+            source = item.get("source") or metadata.get("source") or metadata.get("filename") or "unknown"
             if snippet:
                 snippets.append(snippet)
             citations.append(source)
@@ -190,7 +195,7 @@ class VoicePipeline:
 
         kb_context = "\n\n".join(snippets)
         if self.settings.use_llm:
-            llm_answer = self.openai_client.generate_answer(query=transcript, kb_context=kb_context)
+            llm_answer = await self.openai_client.generate_answer(transcript=transcript, context=kb_context)
             if not llm_answer:
                 llm_answer = "I need a little more context to answer this accurately."
             return f"{llm_answer}\n\nSources: {', '.join(deduped_citations)}", deduped_citations
@@ -1,40 +1,51 @@
 from fastapi import APIRouter, Query
 
 from app.clients.pinecone_client import PineconeClient
-from app.services.embeddings import embed_text
+from app.config import get_settings
+from app.services.embeddings import embed_text_async
+from app.services.qv_cache import QVCache
 
 router = APIRouter(prefix="/kb", tags=["knowledge-base"])
 
+settings = get_settings()
 pc = PineconeClient()
+qv_cache = QVCache(
+    capacity=settings.qv_cache_size,
+    threshold=settings.qv_cache_similarity,
+    ttl=settings.qv_cache_ttl_seconds,
+)
 
 
 @router.get("/search")
-def search_kb(
+async def search_kb(
     q: str = Query(...),
     k: int = 5,
 ):
 
-    vector = embed_text(q)
+    vector = await embed_text_async(q)
 
-    result = pc.query(
-        vector=vector,
-        top_k=k,
-    )
-
-    matches = []
+    matches = qv_cache.get(vector, top_k=k)
+    if matches is None:
+        result = await pc.aquery(
+            vector=vector,
+            top_k=k,
+        )
 
-    for m in result.matches:
+        matches = [_match_payload(m) for m in result.matches]
 
-        matches.append(
-            {
-                "id": m.id,
-                "score": m.score,
-                "text": m.metadata.get("text"),
-                "source": m.metadata.get("source"),
-            }
-        )
+        qv_cache.put(vector, top_k=k, matches=matches)
 
     return {
         "query": q,
         "results": matches,
     }
+
+
+def _match_payload(match) -> dict:
+    metadata = match.metadata or {}
+    return {
+        "id": match.id,
+        "score": match.score,
+        "text": metadata.get("text"),
+        "source": metadata.get("source"),
+    }
@@ -1,13 +1,211 @@
-from openai import OpenAI
- 
-client = OpenAI()
- 
- 
-def embed_text(text: str):
- 
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=text,
-    )
- 
-    return response.data[0].embedding
\ No newline at end of file
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+from app.config import get_settings
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# (model, normalized text) -> (expires_at, embedding), least recently used first
+_cache: OrderedDict[tuple[str, str], tuple[float, tuple[float, ...]]] = OrderedDict()
+_cache_lock = threading.Lock()
+_db_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _async_openai_client():
+    settings = get_settings()
+    if not settings.openai_api_key:
+        return None
+
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=settings.openai_api_key, timeout=settings.request_timeout_seconds)
+
+
+@lru_cache(maxsize=1)
+def _cache_db() -> sqlite3.Connection | None:
+    # On-disk tier of the cache so restarts and sibling workers reuse embeddings.
+    settings = get_settings()
+    path = Path(settings.embed_cache_db or Path(settings.output_dir) / "embeddings_cache.db")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embed_cache "
+            "(key TEXT PRIMARY KEY, vec BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        conn.commit()
+    except (OSError, sqlite3.Error):
+        return None
+    return conn
+
+
+async def embed_text_async(text: str) -> list[float]:
+    """Embed one text: cache tiers first, then a shared micro-batched API call."""
+    key = _cache_key(text)
+    vector = _cache_get(key)
+    if vector is None:
+        vector = (await asyncio.to_thread(_db_get, [text])).get(text)
+        if vector is not None:
+            _cache_put(key, vector)
+    if vector is None:
+        vector = await _batcher.embed(text)
+    return list(vector)
+
+
+class BatchEmbedder:
+    """Coalesces concurrent embedding requests into one embeddings.create call.
+
+    Requests are queued; a background task takes up to ``max_batch`` of them,
+    waiting at most ``max_wait`` seconds after the first one, and resolves each
+    caller's future from the single batched response. Batches are flushed in
+    their own tasks, at most ``max_inflight`` API calls at a time, so one slow
+    call does not hold up the batches queued behind it.
+    """
+
+    def __init__(self, max_batch: int = 32, max_wait: float = 0.005, max_inflight: int = 8) -> None:
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future]] | None = None
+        self._worker: asyncio.Task | None = None
+        self._inflight = asyncio.Semaphore(max_inflight)
+        # Strong references so in-flight flushes are not garbage collected mid-call.
+        self._flushes: set[asyncio.Task] = set()
+
+    async def embed(self, text: str) -> tuple[float, ...]:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            client = _async_openai_client()
+            if client is None:
+                raise RuntimeError("Missing OPENAI_API_KEY")
+            async with self._inflight:
+                response = await client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        # Resolve every caller even if the response is short or mismatched; raising
+        # here would kill the worker task and leave the rest of the batch waiting forever.
+        vectors: dict[str, tuple[float, ...]] = {}
+        error: Exception | None = None
+        try:
+            for item in response.data:
+                vectors[texts[item.index]] = tuple(item.embedding)
+        except Exception as exc:
+            error = exc
+        for text, future in batch:
+            if future.done():
+                continue
+            if text in vectors:
+                future.set_result(vectors[text])
+            else:
+                future.set_exception(error or RuntimeError("Embedding response is missing an input"))
+        for text, vector in vectors.items():
+            _cache_put(_cache_key(text), vector)
+        await asyncio.to_thread(_db_put, vectors)
+
+
+_batcher = BatchEmbedder()
+
+
+def _cache_key(text: str) -> tuple[str, str]:
+    # Case and whitespace variants of the same query share one entry.
+    return EMBEDDING_MODEL, " ".join(text.split()).casefold()
+
+
+def _cache_get(key: tuple[str, str]) -> tuple[float, ...] | None:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        expires_at, vector = entry
+        if expires_at and expires_at < time.monotonic():
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return vector
+
+
+def _cache_put(key: tuple[str, str], vector: tuple[float, ...]) -> None:
+    settings = get_settings()
+    ttl = settings.embed_cache_ttl_seconds
+    expires_at = time.monotonic() + ttl if ttl > 0 else 0.0
+    with _cache_lock:
+        _cache[key] = (expires_at, vector)
+        _cache.move_to_end(key)
+        while len(_cache) > settings.embed_cache_size:
+            _cache.popitem(last=False)
+
+
+def _db_key(text: str) -> str:
+    return hashlib.sha256("\0".join(_cache_key(text)).encode("utf-8")).hexdigest()
+
+
+def _db_get(texts: list[str]) -> dict[str, tuple[float, ...]]:
+    conn = _cache_db()
+    if conn is None:
+        return {}
+
+    keys = {_db_key(text): text for text in texts}
+    ttl = get_settings().embed_cache_ttl_seconds
+    min_created_at = time.time() - ttl if ttl > 0 else 0.0
+    placeholders = ",".join("?" * len(keys))
+    try:
+        with _db_lock:
+            rows = conn.execute(
+                f"SELECT key, vec FROM embed_cache WHERE key IN ({placeholders}) AND created_at >= ?",
+                [*keys, min_created_at],
+            ).fetchall()
+    except sqlite3.Error:
+        return {}
+    return {keys[key]: tuple(array("f", blob)) for key, blob in rows}
+
+
+def _db_put(vectors: dict[str, tuple[float, ...]]) -> None:
+    conn = _cache_db()
+    if conn is None:
+        return
+
+    now = time.time()
+    rows = [(_db_key(text), array("f", vector).tobytes(), now) for text, vector in vectors.items()]
+    try:
+        with _db_lock, conn:
+            conn.executemany("INSERT OR REPLACE INTO embed_cache (key, vec, created_at) VALUES (?, ?, ?)", rows)
+    except sqlite3.Error:
+        pass
@@ -1,3 +1,5 @@
+from typing import AsyncIterator
+
 from app.clients import OpenAIClient, PersonaPlexClient
 
 
@@ -8,7 +10,7 @@ class LLMService:
 
     async def generate(self, transcript: str, context: str = "") -> str:
         if self.openai_client.client:
-            answer = self.openai_client.generate_answer(transcript=transcript, context=context)
+            answer = await self.openai_client.generate_answer(transcript=transcript, context=context)
             if answer:
                 return answer
 
@@ -17,3 +19,13 @@ class LLMService:
             return personaplex_answer
 
         return f"LLM not configured. Transcript: {transcript}"
+
+    async def stream(self, transcript: str, context: str = "") -> AsyncIterator[str]:
+        streamed = False
+        if self.openai_client.client:
+            async for delta in self.openai_client.stream_answer(transcript=transcript, context=context):
+                streamed = True
+                yield delta
+
+        if not streamed:
+            yield await self.generate(transcript=transcript, context=context)
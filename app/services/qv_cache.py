@@ -0,0 +1,73 @@
+import time
+from typing import Any
+
+import numpy as np
+
+
+class QVCache:
+    """Semantic cache of recent query vectors and the matches they returned.
+
+    A lookup hits when the cosine similarity between the incoming query vector
+    and a cached one reaches ``threshold``, letting the caller skip the remote
+    vector search. Entries live in a fixed-size ring buffer, oldest evicted first,
+    and stop matching ``ttl`` seconds after insertion (0 = never) so re-upserted
+    index content is picked up even when little traffic evicts them.
+    """
+
+    def __init__(self, capacity: int = 1024, threshold: float = 0.92, ttl: float = 0.0):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self._vectors: np.ndarray | None = None
+        self._inserted_at = np.zeros(capacity, dtype=np.float64)
+        self._entries: list[tuple[int, list[dict[str, Any]]] | None] = [None] * capacity
+        self._size = 0
+        self._next = 0
+
+    def get(self, vector: list[float], top_k: int) -> list[dict[str, Any]] | None:
+        if not self.capacity or self._vectors is None or not self._size:
+            return None
+
+        q = _normalize(vector)
+        if q is None or q.shape[0] != self._vectors.shape[1]:
+            return None
+
+        sims = self._vectors[: self._size] @ q
+        if self.ttl > 0:
+            expired = self._inserted_at[: self._size] < time.monotonic() - self.ttl
+            sims[expired] = -np.inf
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+
+        cached_top_k, matches = self._entries[best]
+        if cached_top_k < top_k:
+            return None
+        return matches[:top_k]
+
+    def put(self, vector: list[float], top_k: int, matches: list[dict[str, Any]]) -> None:
+        if not self.capacity:
+            return
+
+        q = _normalize(vector)
+        if q is None:
+            return
+        if self._vectors is None or self._vectors.shape[1] != q.shape[0]:
+            self._vectors = np.zeros((self.capacity, q.shape[0]), dtype=np.float32)
+            self._entries = [None] * self.capacity
+            self._size = 0
+            self._next = 0
+
+        self._vectors[self._next] = q
+        self._entries[self._next] = (top_k, matches)
+        self._inserted_at[self._next] = time.monotonic()
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+
+def _normalize(vector: list[float]) -> np.ndarray | None:
+    q = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(q))
+    if not norm:
+        return None
+    return q / norm
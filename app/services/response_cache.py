@@ -0,0 +1,209 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import orjson
+
+from app.services.embeddings import embed_text_async
+from app.services.qv_cache import _normalize
+
+
+@dataclass(slots=True, frozen=True)
+class CachedResponse:
+    assistant_text: str
+    citations: list[str]
+    audio_path: Path
+
+
+class ResponseCache:
+    """Semantic cache of finished /api/voice answers, keyed on the transcript embedding.
+
+    A lookup hits when a previous transcript in the same scope (mode + user) has
+    cosine similarity of at least ``threshold``; the caller then reuses its text
+    and audio instead of running the LLM and TTS again. Entries are stored in
+    SQLite so every worker shares them. Each worker loads a scope into memory on
+    its first lookup, pulls newer rows by row id, and drops the least recently
+    used scopes once ``max_total_entries`` rows or ``max_scopes`` scopes are
+    resident. A ``threshold`` of 0 disables it.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        threshold: float = 0.0,
+        max_entries: int = 1000,
+        max_total_entries: int = 10_000,
+        max_scopes: int = 1024,
+    ) -> None:
+        self.db_path = db_path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_total_entries = max_total_entries
+        self.max_scopes = max_scopes
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._last_id = 0
+        # scope -> (row ids, normalized vectors, cached responses), least recently used first
+        self._scopes: OrderedDict[str, tuple[list[int], np.ndarray, list[CachedResponse]]] = OrderedDict()
+        self._resident_rows = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    async def lookup(self, transcript: str, scope: str) -> CachedResponse | None:
+        if not self.enabled or not transcript.strip():
+            return None
+        try:
+            vector = await embed_text_async(transcript)
+        except Exception:
+            return None
+        return await asyncio.to_thread(self._lookup, scope, vector)
+
+    async def store(self, transcript: str, scope: str, response: CachedResponse) -> None:
+        if not self.enabled or not transcript.strip():
+            return
+        try:
+            vector = await embed_text_async(transcript)
+        except Exception:
+            return
+        await asyncio.to_thread(self._store, scope, vector, response)
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if self._conn is None:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS response_cache "
+                    "(id INTEGER PRIMARY KEY AUTOINCREMENT, scope TEXT NOT NULL, vec BLOB NOT NULL, "
+                    "assistant_text TEXT NOT NULL, citations BLOB NOT NULL, audio_path TEXT NOT NULL, "
+                    "created_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS response_cache_scope ON response_cache (scope, id)")
+                conn.commit()
+                # Scopes are loaded on demand, so there is no backlog of older rows to pull.
+                self._last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM response_cache").fetchone()[0]
+            except (OSError, sqlite3.Error):
+                return None
+            self._conn = conn
+        return self._conn
+
+    def _sync(self, conn: sqlite3.Connection, scope: str) -> None:
+        if scope not in self._scopes:
+            rows = conn.execute(
+                f"SELECT {_COLUMNS} FROM response_cache WHERE scope = ? AND id <= ? ORDER BY id DESC LIMIT ?",
+                (scope, self._last_id, self.max_entries),
+            ).fetchall()
+            self._append(scope, rows[::-1])
+
+        # Rows written since the last sync by this or sibling workers; only resident scopes keep theirs.
+        rows = conn.execute(
+            f"SELECT {_COLUMNS} FROM response_cache WHERE id > ? ORDER BY id", (self._last_id,)
+        ).fetchall()
+        if rows:
+            self._last_id = rows[-1][0]
+        new_rows: dict[str, list[tuple]] = {}
+        for row in rows:
+            if row[1] in self._scopes:
+                new_rows.setdefault(row[1], []).append(row)
+        for row_scope, scope_rows in new_rows.items():
+            self._append(row_scope, scope_rows)
+
+        self._scopes.move_to_end(scope)
+        while len(self._scopes) > 1 and (
+            self._resident_rows > self.max_total_entries or len(self._scopes) > self.max_scopes
+        ):
+            _, (ids, _, _) = self._scopes.popitem(last=False)
+            self._resident_rows -= len(ids)
+
+    def _append(self, scope: str, rows: list[tuple]) -> None:
+        ids, vectors, responses = self._scopes.get(scope, ([], np.empty((0, 0), np.float32), []))
+        resident = len(ids)
+
+        parsed = []
+        for row_id, _, blob, assistant_text, citations, audio_path in rows:
+            q = _normalize(np.frombuffer(blob, dtype=np.float32))
+            if q is not None:
+                parsed.append((row_id, q, CachedResponse(assistant_text, orjson.loads(citations), Path(audio_path))))
+        if parsed:
+            # The newest rows decide the dimension, e.g. after an embedding model change.
+            dim = parsed[-1][1].shape[0]
+            parsed = [item for item in parsed if item[1].shape[0] == dim]
+            if vectors.shape[1] != dim:
+                ids, vectors, responses = [], np.empty((0, dim), np.float32), []
+            # One stack per batch rather than per row, which would copy the matrix each time.
+            ids = ids + [row_id for row_id, _, _ in parsed]
+            vectors = np.vstack([vectors, *(q for _, q, _ in parsed)])
+            responses = responses + [response for _, _, response in parsed]
+            if len(ids) > self.max_entries:
+                keep = slice(-self.max_entries, None)
+                ids, vectors, responses = ids[keep], vectors[keep], responses[keep]
+
+        self._scopes[scope] = (ids, vectors, responses)
+        self._resident_rows += len(ids) - resident
+
+    def _lookup(self, scope: str, vector: list[float]) -> CachedResponse | None:
+        q = _normalize(vector)
+        if q is None:
+            return None
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                self._sync(conn, scope)
+            except sqlite3.Error:
+                return None
+            _, vectors, responses = self._scopes[scope]
+            if vectors.shape[1] != q.shape[0]:
+                return None
+            sims = vectors @ q
+            # Newest first among hits, skipping answers whose audio has since been removed.
+            for idx in np.flatnonzero(sims >= self.threshold)[::-1]:
+                response = responses[idx]
+                if response.audio_path.is_file():
+                    return response
+        return None
+
+    def _store(self, scope: str, vector: list[float], response: CachedResponse) -> None:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT INTO response_cache (scope, vec, assistant_text, citations, audio_path, created_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            scope,
+                            np.asarray(vector, dtype=np.float32).tobytes(),
+                            response.assistant_text,
+                            orjson.dumps(response.citations),
+                            str(response.audio_path),
+                            time.time(),
+                        ),
+                    )
+                    conn.execute(
+                        "DELETE FROM response_cache WHERE scope = ? AND id < "
+                        "(SELECT id FROM response_cache WHERE scope = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (scope, scope, self.max_entries - 1),
+                    )
+                    # Scopes come from unauthenticated form fields, so cap the table as a whole too.
+                    conn.execute(
+                        "DELETE FROM response_cache WHERE id < "
+                        "(SELECT id FROM response_cache ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (self.max_total_entries - 1,),
+                    )
+            except sqlite3.Error:
+                pass
+
+
+_COLUMNS = "id, scope, vec, assistant_text, citations, audio_path"
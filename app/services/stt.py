@@ -4,10 +4,18 @@ import httpx
 
 from app.config import Settings
 
+_CONTENT_TYPES: dict[str, str] = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".webm": "audio/webm",
+    ".m4a": "audio/mp4",
+}
+
 
 class STTService:
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, client: httpx.AsyncClient):
         self.settings = settings
+        self.client = client
 
     async def transcribe(self, audio_path: Path) -> str:
         if not self.settings.elevenlabs_api_key:
@@ -17,22 +25,17 @@ class STTService:
         headers = {"xi-api-key": self.settings.elevenlabs_api_key}
         content_type = _detect_content_type(audio_path.suffix.lower())
 
-        files = {
-            "file": (audio_path.name, audio_path.read_bytes(), content_type),
-            "model_id": (None, "scribe_v1"),
-        }
-
-        async with httpx.AsyncClient(timeout=self.settings.request_timeout_seconds) as client:
-            response = await client.post(url, headers=headers, files=files)
-            response.raise_for_status()
-            payload = response.json()
+        # httpx streams the multipart body from the open handle instead of a full in-memory copy
+        with audio_path.open("rb") as audio_file:
+            files = {
+                "file": (audio_path.name, audio_file, content_type),
+                "model_id": (None, "scribe_v1"),
+            }
+            response = await self.client.post(url, headers=headers, files=files)
+        response.raise_for_status()
+        payload = response.json()
         return (payload.get("text") or "").strip() or "No transcript returned from STT provider."
 
 
 def _detect_content_type(suffix: str) -> str:
-    return {
-        ".wav": "audio/wav",
-        ".mp3": "audio/mpeg",
-        ".webm": "audio/webm",
-        ".m4a": "audio/mp4",
-    }.get(suffix, "application/octet-stream")
+    return _CONTENT_TYPES.get(suffix, "application/octet-stream")
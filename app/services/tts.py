@@ -1,21 +1,97 @@
-import math
+import asyncio
+import re
 import struct
-import wave
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, AsyncIterator
 
+import aiofiles
 import httpx
+import numpy as np
 
 from app.config import Settings
 
+AUDIO_CHUNK_BYTES = 64 * 1024
+MAX_CHUNK_WORDS = 80
+
+# Sentence punctuation (plus closing quotes/brackets) only counts once whitespace follows it,
+# so "$3." waits for the next delta instead of cutting "$3.50" in two.
+_SENTENCE_BOUNDARY = re.compile(r"[.?!]+[\"')\]]*(?=\s)")
+_ABBREVIATION = re.compile(r"(?:\b[A-Za-z]\.){2,}$|\b(?:mr|mrs|ms|dr|prof|st|vs|no|approx)\.$", re.IGNORECASE)
+
 
 class TTSService:
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, client: httpx.AsyncClient):
         self.settings = settings
+        self.client = client
+        # Bounds in-flight syntheses (upstream rate limits today, CPU/GPU for a local model later)
+        self._semaphore = asyncio.Semaphore(max(1, settings.tts_concurrency))
 
     async def synthesize(self, text: str, output_path: Path) -> Path:
+        async with self._semaphore:
+            if not self.settings.elevenlabs_api_key:
+                return await asyncio.to_thread(_generate_fallback_beep, output_path)
+
+            url, headers, payload = self._elevenlabs_request(text)
+            async with self.client.stream("POST", url, headers=headers, json=payload) as response:
+                response.raise_for_status()
+                async with aiofiles.open(output_path, "wb") as audio_file:
+                    async for chunk in response.aiter_bytes(AUDIO_CHUNK_BYTES):
+                        await audio_file.write(chunk)
+
+        return output_path
+
+    async def synthesize_stream(self, deltas: AsyncIterator[str], output_path: Path) -> tuple[str, Path]:
+        """Synthesize text while it is still being generated.
+
+        Each sentence-sized chunk is sent to TTS as soon as it is complete, so
+        synthesis overlaps with the rest of the generation; the MP3 segments are
+        appended to ``output_path`` in order as they arrive. Returns the full text
+        and the written audio path.
+        """
         if not self.settings.elevenlabs_api_key:
-            return _generate_fallback_beep(output_path)
+            text = "".join([delta async for delta in deltas]).strip()
+            return text, await self.synthesize(text=text, output_path=output_path)
+
+        parts: list[str] = []
+        tasks: list[asyncio.Task[bytes]] = []
+        pending: asyncio.Queue[asyncio.Task[bytes] | None] = asyncio.Queue()
+        writer = asyncio.create_task(_write_segments(pending, output_path))
+
+        def schedule(text: str) -> None:
+            if text.strip():
+                task = asyncio.create_task(self.synthesize_chunk(text.strip()))
+                tasks.append(task)
+                pending.put_nowait(task)
+
+        buffer = ""
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                buffer += delta
+                head, buffer = _split_sentences(buffer)
+                if not head and len(buffer.split()) >= MAX_CHUNK_WORDS:
+                    # Long run without a boundary: cut at the last space, never mid-word.
+                    head, _, buffer = buffer.rpartition(" ")
+                schedule(head)
+            schedule(buffer)
+            pending.put_nowait(None)
+            await writer
+        finally:
+            writer.cancel()
+            for task in tasks:
+                task.cancel()
 
+        return "".join(parts).strip(), output_path
+
+    async def synthesize_chunk(self, text: str) -> bytes:
+        url, headers, payload = self._elevenlabs_request(text)
+        async with self._semaphore:
+            response = await self.client.post(url, headers=headers, json=payload)
+        response.raise_for_status()
+        return response.content
+
+    def _elevenlabs_request(self, text: str) -> tuple[str, dict[str, str], dict[str, Any]]:
         url = f"https://api.elevenlabs.io/v1/text-to-speech/{self.settings.elevenlabs_voice_id}"
         headers = {
             "xi-api-key": self.settings.elevenlabs_api_key,
@@ -27,32 +103,61 @@ class TTSService:
             "model_id": "eleven_multilingual_v2",
             "voice_settings": {"stability": 0.4, "similarity_boost": 0.7},
         }
+        return url, headers, payload
 
-        async with httpx.AsyncClient(timeout=self.settings.request_timeout_seconds) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            audio_data = response.content
 
-        output_path.write_bytes(audio_data)
-        return output_path
+def _split_sentences(buffer: str) -> tuple[str, str]:
+    """Split ``buffer`` after its last complete sentence; ("", buffer) if it has none."""
+    end = 0
+    for match in _SENTENCE_BOUNDARY.finditer(buffer):
+        if not _ABBREVIATION.search(buffer, 0, match.end()):
+            end = match.end()
+    return buffer[:end], buffer[end:]
+
+
+async def _write_segments(pending: asyncio.Queue, output_path: Path) -> None:
+    # Appends each chunk's audio as soon as it and every earlier chunk are done, so only
+    # out-of-order segments are ever held in memory. None marks the end of the stream.
+    async with aiofiles.open(output_path, "wb") as audio_file:
+        while (task := await pending.get()) is not None:
+            await audio_file.write(await task)
 
 
 def _generate_fallback_beep(output_path: Path) -> Path:
+    output_path.write_bytes(_fallback_beep_wav())
+    return output_path
+
+
+@lru_cache(maxsize=1)
+def _fallback_beep_wav() -> bytes:
     sample_rate = 16000
     duration_seconds = 1.0
     frequency_hz = 440.0
     amplitude = 12000
     n_samples = int(sample_rate * duration_seconds)
 
-    with wave.open(str(output_path), "wb") as wav_file:
-        wav_file.setnchannels(1)
-        wav_file.setsampwidth(2)
-        wav_file.setframerate(sample_rate)
+    t = np.arange(n_samples, dtype=np.float64)
+    samples = (amplitude * np.sin(2 * np.pi * frequency_hz * t / sample_rate)).astype("<i2")
 
-        frames = bytearray()
-        for i in range(n_samples):
-            sample = int(amplitude * math.sin(2 * math.pi * frequency_hz * i / sample_rate))
-            frames.extend(struct.pack("<h", sample))
-        wav_file.writeframes(bytes(frames))
+    return _wav_header(n_samples, sample_rate) + samples.tobytes()
 
-    return output_path
+
+def _wav_header(n_samples: int, sample_rate: int) -> bytes:
+    # 16-bit mono PCM RIFF/WAVE header.
+    data_size = n_samples * 2
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,
+        1,
+        1,
+        sample_rate,
+        sample_rate * 2,
+        2,
+        16,
+        b"data",
+        data_size,
+    )
@@ -1,71 +1,164 @@
-import json
-import uuid
+import asyncio
+import os
+import secrets
+import time
+import weakref
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+import orjson
+
+LOG_FLUSH_LINES = 64
+JOB_CACHE_SIZE = 1024
+
+# (epoch milliseconds, ISO string) of the last JobStorage._now() call
+_last_now: tuple[int, str] = (0, "")
+
 
 class JobStorage:
     def __init__(self, output_dir: str):
         self.base_dir = Path(output_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._base_str = os.fspath(self.base_dir)
+        # job_id -> event fired on the next update_job; dropped once no listener holds it
+        self._events: weakref.WeakValueDictionary[str, asyncio.Event] = weakref.WeakValueDictionary()
+        # job_id -> (job.json mtime_ns, meta), least recently used first; an entry is
+        # stale once another worker rewrites the file
+        self._jobs: OrderedDict[str, tuple[int, dict[str, Any]]] = OrderedDict()
+        # job_id -> run.log lines not yet written; see save_log/flush_log
+        self._log_buffers: dict[str, list[str]] = {}
 
     def create_job(self, initial_meta: dict[str, Any] | None = None) -> str:
-        job_id = uuid.uuid4().hex
+        job_id = secrets.token_hex(16)
         job_dir = self.job_dir(job_id)
         job_dir.mkdir(parents=True, exist_ok=True)
 
+        now = self._now()
         meta = {
             "job_id": job_id,
             "status": "queued",
-            "created_at": self._now(),
-            "updated_at": self._now(),
+            "created_at": now,
+            "updated_at": now,
         }
         if initial_meta:
             meta.update(initial_meta)
 
-        self.save_json(job_id, "job.json", meta)
+        self._save_job(job_id, meta)
         return job_id
 
     def job_dir(self, job_id: str) -> Path:
         return self.base_dir / job_id
 
+    def _file_path(self, job_id: str, filename: str) -> str:
+        # Plain string join: the save_* hot paths skip building two Path objects per write.
+        return os.path.join(self._base_str, job_id, filename)
+
     def job_exists(self, job_id: str) -> bool:
         return self.job_dir(job_id).exists()
 
     def save_bytes(self, job_id: str, filename: str, data: bytes) -> Path:
-        path = self.job_dir(job_id) / filename
-        path.write_bytes(data)
-        return path
+        path = self._file_path(job_id, filename)
+        with open(path, "wb") as handle:
+            handle.write(data)
+        return Path(path)
 
     def save_text(self, job_id: str, filename: str, text: str) -> Path:
-        path = self.job_dir(job_id) / filename
-        path.write_text(text, encoding="utf-8")
-        return path
+        path = self._file_path(job_id, filename)
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        return Path(path)
 
-    def save_json(self, job_id: str, filename: str, payload: dict[str, Any]) -> Path:
-        path = self.job_dir(job_id) / filename
-        path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
-        return path
+    def save_json(self, job_id: str, filename: str, payload: dict[str, Any], compact: bool = False) -> Path:
+        path = self._file_path(job_id, filename)
+        data = orjson.dumps(payload) if compact else orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+        # Write a uniquely named sibling and rename it into place so readers never see a partial file.
+        tmp = f"{path}.{secrets.token_hex(4)}.tmp"
+        with open(tmp, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp, path)
+        return Path(path)
+
+    def save_log(self, job_id: str, line: str) -> None:
+        """Queue a line for the job's run.log; it is written with the next flush_log.
+
+        The buffer flushes itself every LOG_FLUSH_LINES lines so a long job does not
+        hold its whole log in memory.
+        """
+        lines = self._log_buffers.setdefault(job_id, [])
+        lines.append(line)
+        if len(lines) >= LOG_FLUSH_LINES:
+            self.flush_log(job_id)
+
+    def flush_log(self, job_id: str) -> None:
+        lines = self._log_buffers.pop(job_id, None)
+        if not lines:
+            return
+        data = "".join(f"{line.rstrip()}\n" for line in lines).encode("utf-8")
+        # O_APPEND makes each batch a single atomic append, even with several writers.
+        fd = os.open(self._file_path(job_id, "run.log"), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
 
     def read_json(self, job_id: str, filename: str) -> dict[str, Any]:
         path = self.job_dir(job_id) / filename
-        return json.loads(path.read_text(encoding="utf-8"))
+        return orjson.loads(path.read_bytes())
 
     def read_text(self, job_id: str, filename: str) -> str:
         path = self.job_dir(job_id) / filename
         return path.read_text(encoding="utf-8")
 
     def update_job(self, job_id: str, **updates: Any) -> dict[str, Any]:
-        meta = self.read_json(job_id, "job.json")
+        meta = self.get_job(job_id)
         meta.update(updates)
         meta["updated_at"] = self._now()
-        self.save_json(job_id, "job.json", meta)
+        self._save_job(job_id, meta)
+
+        event = self._events.pop(job_id, None)
+        if event is not None:
+            event.set()
         return meta
 
+    def job_event(self, job_id: str) -> asyncio.Event:
+        """Event set by the next update_job for this job (call from the event loop thread).
+
+        Grab it before reading the job so an update in between is not missed.
+        """
+        event = self._events.get(job_id)
+        if event is None:
+            event = asyncio.Event()
+            self._events[job_id] = event
+        return event
+
     def get_job(self, job_id: str) -> dict[str, Any]:
-        return self.read_json(job_id, "job.json")
+        # A stat is enough to trust the in-memory copy; parse job.json only when it changed.
+        mtime_ns = os.stat(self._file_path(job_id, "job.json")).st_mtime_ns
+        cached = self._jobs.get(job_id)
+        if cached is None or cached[0] != mtime_ns:
+            cached = (mtime_ns, self.read_json(job_id, "job.json"))
+        self._remember_job(job_id, cached)
+        return dict(cached[1])
+
+    def _save_job(self, job_id: str, meta: dict[str, Any]) -> None:
+        # Write-through: job.json stays the source of truth that other workers read.
+        self.save_json(job_id, "job.json", meta, compact=True)
+        self._remember_job(job_id, (os.stat(self._file_path(job_id, "job.json")).st_mtime_ns, dict(meta)))
+
+    def _remember_job(self, job_id: str, entry: tuple[int, dict[str, Any]]) -> None:
+        self._jobs[job_id] = entry
+        self._jobs.move_to_end(job_id)
+        while len(self._jobs) > JOB_CACHE_SIZE:
+            self._jobs.popitem(last=False)
 
     @staticmethod
     def _now() -> str:
-        return datetime.now(timezone.utc).isoformat()
+        # Bursts of updates within the same millisecond reuse one formatted timestamp.
+        global _last_now
+        ms = time.time_ns() // 1_000_000
+        if _last_now[0] != ms:
+            iso = datetime.fromtimestamp(ms / 1000, tz=timezone.utc).isoformat(timespec="milliseconds")
+            _last_now = (ms, iso)
+        return _last_now[1]
@@ -1,22 +1,29 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import os
-import subprocess
-import uuid
+import secrets
+import tempfile
+from email.utils import formatdate
+from functools import lru_cache
 from pathlib import Path
 
-from fastapi import FastAPI, File, HTTPException, Query, UploadFile
-from fastapi.responses import FileResponse
+import orjson
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import FileResponse, Response
 
 from .kb import kb, router as kb_router
 
 APP_ROOT = Path('/workspace/voice-assistant')
 UPLOAD_DIR = APP_ROOT / 'uploads'
 OUTPUT_DIR = APP_ROOT / 'outputs'
+_OUTPUT_DIR_STR = str(OUTPUT_DIR)
 LOG_DIR = APP_ROOT / 'logs'
 PERSONAPLEX_ROOT = Path('/workspace/personaplex')
 DEFAULT_VOICE_PROMPT = 'NATF2.pt'
+UPLOAD_CHUNK_BYTES = 1 << 20
+# Moshi runs are GPU bound; extra requests wait here instead of spawning competing processes.
+INFERENCE_SEM = asyncio.Semaphore(int(os.getenv('MAX_CONCURRENT_JOBS', '1')))
 
 
 def ensure_dirs() -> None:
@@ -58,17 +65,19 @@ async def offline_inference(
         raise HTTPException(status_code=400, detail='Only .wav file uploads are supported')
 
     ensure_dirs()
-    job_id = uuid.uuid4().hex
-    job_output_dir = OUTPUT_DIR / job_id
-    job_output_dir.mkdir(parents=True, exist_ok=True)
+    job_id = secrets.token_hex(16)
+    job_output_dir = os.path.join(_OUTPUT_DIR_STR, job_id)
+    os.makedirs(job_output_dir, exist_ok=True)
 
     upload_path = UPLOAD_DIR / f'{job_id}_{Path(file.filename).name}'
-    input_bytes = await file.read()
-    upload_path.write_bytes(input_bytes)
+    # Copy in 1 MiB chunks so a long WAV is never held in memory in full.
+    with upload_path.open('wb', buffering=UPLOAD_CHUNK_BYTES) as out:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            out.write(chunk)
 
-    output_wav = job_output_dir / 'output.wav'
-    output_json = job_output_dir / 'output.json'
-    run_log = job_output_dir / 'run.log'
+    output_wav = os.path.join(job_output_dir, 'output.wav')
+    output_json = os.path.join(job_output_dir, 'output.json')
+    run_log = os.path.join(job_output_dir, 'run.log')
 
     command = [
         'python',
@@ -81,44 +90,61 @@ async def offline_inference(
         '--seed',
         str(seed),
         '--output-wav',
-        str(output_wav),
+        output_wav,
         '--output-text',
-        str(output_json),
+        output_json,
     ]
 
-    completed = subprocess.run(
-        command,
-        cwd=str(PERSONAPLEX_ROOT),
-        capture_output=True,
-        text=True,
-    )
+    # Run Moshi without blocking the event loop so other endpoints stay responsive.
+    # Its logs go straight to temp files, so the kernel writes them without Python pumping a pipe.
+    with tempfile.TemporaryFile() as tmp_out, tempfile.TemporaryFile() as tmp_err:
+        async with INFERENCE_SEM:
+            proc = await asyncio.create_subprocess_exec(
+                *command,
+                cwd=str(PERSONAPLEX_ROOT),
+                stdout=tmp_out,
+                stderr=tmp_err,
+            )
+            try:
+                await proc.wait()
+            except BaseException:
+                # Cancelled mid-run: reap the child before releasing the slot so the cap still holds.
+                if proc.returncode is None:
+                    proc.kill()
+                await proc.wait()
+                raise
+        tmp_out.seek(0)
+        stdout = tmp_out.read().decode('utf-8', errors='replace')
+        tmp_err.seek(0)
+        stderr = tmp_err.read().decode('utf-8', errors='replace')
 
     combined_log = (
         f'COMMAND: {" ".join(command)}\n\n'
-        f'RETURN_CODE: {completed.returncode}\n\n'
-        f'STDOUT:\n{completed.stdout}\n\nSTDERR:\n{completed.stderr}\n'
+        f'RETURN_CODE: {proc.returncode}\n\n'
+        f'STDOUT:\n{stdout}\n\nSTDERR:\n{stderr}\n'
     )
-    run_log.write_text(combined_log, encoding='utf-8')
+    with open(run_log, 'w', encoding='utf-8') as handle:
+        handle.write(combined_log)
 
-    if completed.returncode != 0:
-        tail_lines = (completed.stderr or completed.stdout).splitlines()[-40:]
+    if proc.returncode != 0:
+        tail_lines = (stderr or stdout).splitlines()[-40:]
         raise HTTPException(
             status_code=500,
             detail={
                 'error': 'Inference failed',
                 'job_id': job_id,
                 'log_tail': '\n'.join(tail_lines),
-                'run_log': str(run_log),
+                'run_log': run_log,
             },
         )
 
-    if not output_wav.exists() or not output_json.exists():
+    if not os.path.exists(output_wav) or not os.path.exists(output_json):
         raise HTTPException(
             status_code=500,
             detail={
                 'error': 'Inference completed but outputs are missing',
                 'job_id': job_id,
-                'run_log': str(run_log),
+                'run_log': run_log,
             },
         )
 
@@ -126,24 +152,54 @@ async def offline_inference(
         'job_id': job_id,
         'output_audio_url': f'/v1/result/{job_id}/audio',
         'output_json_url': f'/v1/result/{job_id}/json',
-        'run_log': str(run_log),
+        'run_log': run_log,
     }
 
 
 @app.get('/v1/result/{job_id}/audio')
-def get_result_audio(job_id: str) -> FileResponse:
-    output_wav = OUTPUT_DIR / job_id / 'output.wav'
-    if not output_wav.exists():
-        raise HTTPException(status_code=404, detail='Output audio not found')
-    return FileResponse(path=output_wav, media_type='audio/wav', filename='output.wav')
+def get_result_audio(job_id: str, request: Request) -> Response:
+    output_wav = os.path.join(_OUTPUT_DIR_STR, job_id, 'output.wav')
+    try:
+        stat = os.stat(output_wav)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail='Output audio not found') from None
+
+    # Repeat pollers that already hold this exact file get a bodiless 304.
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {'ETag': etag, 'Last-Modified': formatdate(stat.st_mtime, usegmt=True)}
+    if _etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        path=output_wav,
+        media_type='audio/wav',
+        filename='output.wav',
+        headers=headers,
+        stat_result=stat,
+    )
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return '*' in tags or etag in tags
 
 
 @app.get('/v1/result/{job_id}/json')
 def get_result_json(job_id: str) -> dict:
-    output_json = OUTPUT_DIR / job_id / 'output.json'
-    if not output_json.exists():
-        raise HTTPException(status_code=404, detail='Output json not found')
     try:
-        return json.loads(output_json.read_text(encoding='utf-8'))
-    except json.JSONDecodeError:
-        return {'raw_text': output_json.read_text(encoding='utf-8', errors='ignore')}
+        mtime_ns = os.stat(os.path.join(_OUTPUT_DIR_STR, job_id, 'output.json')).st_mtime_ns
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail='Output json not found') from None
+    return _load_result_json(job_id, mtime_ns)
+
+
+@lru_cache(maxsize=256)
+def _load_result_json(job_id: str, mtime_ns: int) -> dict:
+    # Keyed on mtime so pollers reuse the parsed result until output.json is rewritten.
+    with open(os.path.join(_OUTPUT_DIR_STR, job_id, 'output.json'), 'rb') as handle:
+        data = handle.read()
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return {'raw_text': data.decode('utf-8', errors='ignore')}
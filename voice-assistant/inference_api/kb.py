@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+import heapq
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from operator import itemgetter
 from pathlib import Path
 from typing import List
 
@@ -8,6 +13,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
 KB_ROOT = Path('/workspace/knowledge_base')
+_TOKEN_RE = re.compile(r'\w+')
 
 
 @dataclass
@@ -15,6 +21,7 @@ class KBDoc:
     doc_id: str
     path: str
     content: str
+    snippet: str
 
 
 class SearchRequest(BaseModel):
@@ -26,23 +33,40 @@ class KnowledgeBase:
     def __init__(self, kb_root: Path = KB_ROOT) -> None:
         self.kb_root = kb_root
         self.docs: List[KBDoc] = []
+        # token -> {position in self.docs: occurrences}
+        self.index: dict[str, dict[int, int]] = {}
         self.error: str | None = None
 
     def load(self) -> None:
         self.docs = []
+        self.index = {}
         self.error = None
 
         if not self.kb_root.exists() or not self.kb_root.is_dir():
             self.error = f'Knowledge base folder not found: {self.kb_root}'
             return
 
-        for md_file in sorted(self.kb_root.rglob('*.md')):
+        files = sorted(self.kb_root.rglob('*.md'))
+        # Reads are I/O bound, so a thread pool overlaps them; docs are still built in path order.
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            results = list(executor.map(_read_one, files))
+
+        for md_file, text in results:
             try:
-                text = md_file.read_text(encoding='utf-8', errors='ignore')
+                if isinstance(text, Exception):
+                    raise text
                 relative = md_file.relative_to(self.kb_root)
-                self.docs.append(
-                    KBDoc(doc_id=str(relative), path=str(md_file), content=text)
+                doc = KBDoc(
+                    doc_id=str(relative),
+                    path=str(md_file),
+                    content=text,
+                    snippet=text[:500].replace('\n', ' ').strip(),
                 )
+                doc_idx = len(self.docs)
+                self.docs.append(doc)
+                # The lowercased copy is only needed to build postings, so it is not kept on the doc.
+                for token, count in Counter(_TOKEN_RE.findall(text.lower())).items():
+                    self.index.setdefault(token, {})[doc_idx] = count
             except Exception as exc:  # noqa: BLE001
                 self.error = f'Failed to load {md_file}: {exc}'
 
@@ -54,32 +78,35 @@ class KnowledgeBase:
             'error': self.error,
         }
 
-    @staticmethod
-    def _score(content: str, query: str) -> int:
-        tokens = [t.lower() for t in query.split() if t.strip()]
-        content_l = content.lower()
-        return sum(content_l.count(token) for token in tokens)
+    def _score(self, doc_idx: int, tokens: list[str]) -> int:
+        return sum(self.index.get(token, {}).get(doc_idx, 0) for token in tokens)
 
     def search(self, query: str, top_k: int) -> list[dict]:
         if self.error:
             raise HTTPException(status_code=500, detail=self.error)
 
-        scores = []
-        for doc in self.docs:
-            score = self._score(doc.content, query)
-            if score > 0:
-                snippet = doc.content[:500].replace('\n', ' ').strip()
-                scores.append(
-                    {
-                        'doc_id': doc.doc_id,
-                        'path': doc.path,
-                        'score': score,
-                        'snippet': snippet,
-                    }
-                )
-
-        scores.sort(key=lambda item: item['score'], reverse=True)
-        return scores[:top_k]
+        tokens = _TOKEN_RE.findall(query.lower())
+        # Only docs containing at least one query token can score above zero.
+        candidates = set().union(*(self.index.get(token, {}) for token in tokens))
+
+        scores = [(doc_idx, self._score(doc_idx, tokens)) for doc_idx in sorted(candidates)]
+        # Partial selection of the top_k winners; result dicts are built only for them.
+        winners = heapq.nlargest(top_k, (item for item in scores if item[1] > 0), key=itemgetter(1))
+        return [
+            {
+                'doc_id': self.docs[doc_idx].doc_id,
+                'path': self.docs[doc_idx].path,
+                'score': score,
+                'snippet': self.docs[doc_idx].snippet,
+            }
+            for doc_idx, score in winners
+        ]
+
+def _read_one(md_file: Path) -> tuple[Path, str | Exception]:
+    try:
+        return md_file, md_file.read_text(encoding='utf-8', errors='ignore')
+    except Exception as exc:  # noqa: BLE001
+        return md_file, exc
 
 
 kb = KnowledgeBase()